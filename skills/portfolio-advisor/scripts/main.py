@@ -1,9 +1,28 @@
 import argparse
 import json
+import queue
 import sys
+import threading
+import warnings
+from pathlib import Path
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 import pandas as pd
 import numpy as np
 
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+# Reuse the stock-analyzer's file cache for sector lookups, and its njit shim
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'stock-analyzer' / 'scripts'))
+# Numba is optional; without it the portfolio kernel runs as plain Python
+from utils._njit import njit
+try:
+    from core.cache import DataCache
+except ImportError:
+    DataCache = None
+
 # Hardcoded sector peers for demonstration/fallback
 # In a real app, this would be dynamic or a larger database
 SECTOR_PEERS = {
@@ -20,69 +39,172 @@ THEMES = {
     'GLP-1 / Obesity': ['LLY', 'NVO']
 }
 
-def get_performance_stats(tickers):
+# Sector lookups are one .info HTTP roundtrip per ticker, so they run on worker threads
+SECTOR_FETCH_WORKERS = 8
+SECTOR_FETCH_TIMEOUT = 10  # seconds per lookup; a ticker that times out keeps 'Unknown'
+
+# Sectors are effectively static, so cached lookups stay valid for a week
+SECTOR_CACHE_DIR = './data/cache/sectors'
+SECTOR_CACHE_TTL = 60 * 24 * 7  # minutes
+
+# Yahoo handles roughly this many symbols per download request
+YF_BATCH_SIZE = 20
+
+def _start_sector_lookups(tickers):
+    """
+    Starts the .info lookups for `tickers` on SECTOR_FETCH_WORKERS daemon threads.
+    Returns {ticker: Future}; cancelling a future skips a lookup not yet started.
+    """
+    futures = {ticker: Future() for ticker in tickers}
+    pending = queue.SimpleQueue()
+    for ticker in tickers:
+        pending.put(ticker)
+
+    def worker():
+        while True:
+            try:
+                ticker = pending.get_nowait()
+            except queue.Empty:
+                return
+            future = futures[ticker]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(yf.Ticker(ticker).info)
+            except Exception as e:
+                future.set_exception(e)
+
+    # Daemon threads (unlike ThreadPoolExecutor's) aren't joined at interpreter
+    # exit, so a hung request can't keep the CLI alive past SECTOR_FETCH_TIMEOUT
+    for _ in range(min(SECTOR_FETCH_WORKERS, len(tickers))):
+        threading.Thread(target=worker, daemon=True).start()
+    return futures
+
+def get_performance_stats(tickers, sector_tickers=None):
     """
     Fetches basic stats for valid tickers.
+    Sectors are only looked up for `sector_tickers` (default: all tickers).
     Returns: {ticker: {'price': float, 'return_6mo': float, 'sector': str}}
     """
-    if not tickers: return {}
+    if yf is None or not tickers: return {}
     try:
-        import yfinance as yf
         stats = {}
         
         # We need sector and history.
         # Batch fetching info is tricky with yfinance as .tickers.info matches aren't guaranteed batch optimized
         # But we can try to be efficient.
         
-        # 1. Fetch Price & History (vectorized)
-        data = yf.download(tickers, period="6mo", progress=False)
+        # 1. Fetch Price & History (vectorized, in batches of YF_BATCH_SIZE symbols)
+        frames = []
+        for i in range(0, len(tickers), YF_BATCH_SIZE):
+            batch = tickers[i:i + YF_BATCH_SIZE]
+            # Passing a list with group_by='column' keeps a (field, ticker) column layout
+            # even for a single ticker; threads=True fetches the symbols in parallel
+            data = yf.download(list(batch), period="6mo", group_by='column', auto_adjust=True,
+                               progress=False, threads=True)
+            batch_closes = data['Close']
+            if isinstance(batch_closes, pd.Series):  # flat columns from older yfinance releases
+                batch_closes = batch_closes.to_frame(batch[0])
+            frames.append(batch_closes)
+        closes = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
         
-        # Check if we got a multi-index dataframe or single
-        if isinstance(data.columns, pd.MultiIndex):
-             closes = data['Close']
-        else:
-             closes = pd.DataFrame(data['Close'])
-             if len(tickers) == 1:
-                 closes.columns = tickers
+        # First/last valid close per ticker in one vectorized pass
+        closes = closes.loc[:, closes.notna().any()]
+        last = closes.ffill().iloc[-1]
+        first = closes.bfill().iloc[0]
+        # A zero start price gives inf/nan; report it as no change
+        ret = (last / first - 1).replace([np.inf, -np.inf], np.nan).fillna(0)
         
         for ticker in tickers:
+            if ticker not in last.index: continue
+            stats[ticker] = {
+                'price': float(last[ticker]),
+                'return_6mo': float(ret[ticker]),
+                'sector': 'Unknown' # Default
+            }
+
+        # 2. Fetch Sector (individual info calls, necessary for peer logic)
+        # Cached sectors are read from one file per ticker; only misses hit the network
+        sector_cache = None
+        if DataCache is not None:
             try:
-                if ticker not in closes.columns: continue
-                
-                series = closes[ticker].dropna()
-                if series.empty: continue
-                
-                current_price = series.iloc[-1]
-                start_price = series.iloc[0]
-                
-                # Check for 0 division
-                if start_price == 0: ret = 0
-                else: ret = (current_price - start_price) / start_price
-                
-                stats[ticker] = {
-                    'price': float(current_price),
-                    'return_6mo': float(ret),
-                    'sector': 'Unknown' # Default
-                }
-            except:
+                sector_cache = DataCache(cache_dir=SECTOR_CACHE_DIR, ttl_minutes=SECTOR_CACHE_TTL)
+            except OSError:
                 pass
-
-        # 2. Fetch Sector (Likely need individual info calls, slow but necessary for peer logic)
-        # We can optimize by only fetching for stocks we own first
-        for ticker in tickers:
-             if ticker in stats:
-                 try:
-                     # This is the slow part
-                     info = yf.Ticker(ticker).info
-                     if 'sector' in info:
-                         stats[ticker]['sector'] = info['sector']
-                 except:
-                     pass
+        
+        lookup = []
+        for ticker in (tickers if sector_tickers is None else sector_tickers):
+            if ticker not in stats: continue
+            sector = sector_cache.get('sector', ticker) if sector_cache else None
+            if sector:
+                stats[ticker]['sector'] = sector
+            else:
+                lookup.append(ticker)
+        
+        # Each call is an independent network roundtrip, so overlap them
+        if lookup:
+            futures = _start_sector_lookups(lookup)
+            try:
+                # The lookups run concurrently, so waiting on each in turn
+                # still gives every one its own SECTOR_FETCH_TIMEOUT
+                for ticker, future in futures.items():
+                    try:
+                        info = future.result(timeout=SECTOR_FETCH_TIMEOUT) or {}
+                    except FuturesTimeoutError:
+                        warnings.warn(f"Sector lookup timed out for {ticker}")
+                        continue
+                    except Exception as e:
+                        # Sectors are optional enrichment: whatever one lookup raises
+                        # (bad payload, HTTP or transport error), keep 'Unknown' for
+                        # that ticker rather than losing the prices fetched above
+                        warnings.warn(f"Sector lookup failed for {ticker}: {e}")
+                        continue
+                    sector = info.get('sector') if isinstance(info, dict) else None
+                    if not sector:
+                        continue
+                    stats[ticker]['sector'] = sector
+                    if sector_cache:
+                        try:
+                            sector_cache.set('sector', ticker, data=sector)
+                        except OSError:
+                            pass  # best effort; the lookup just repeats next run
+            finally:
+                # Drop lookups that haven't started; stragglers keep 'Unknown'
+                for future in futures.values():
+                    future.cancel()
                      
         return stats
     except Exception as e:
         return {}
 
+@njit(cache=True)
+def _portfolio_stats(quantity, cost_basis, current_price):
+    """Per-holding value, P/L, P/L % and weight in one pass over float64 arrays."""
+    n = quantity.shape[0]
+    market_value = np.empty(n)
+    cost_value = np.empty(n)
+    unrealized_pl = np.empty(n)
+    unrealized_pl_pct = np.zeros(n)
+    total_value = 0.0
+    total_cost = 0.0
+    for i in range(n):
+        market_value[i] = quantity[i] * current_price[i]
+        cost_value[i] = quantity[i] * cost_basis[i]
+        unrealized_pl[i] = market_value[i] - cost_value[i]
+        if cost_basis[i] > 0 and cost_value[i] != 0:
+            unrealized_pl_pct[i] = unrealized_pl[i] / cost_value[i] * 100
+        total_value += market_value[i]
+        total_cost += cost_value[i]
+    weight = np.zeros(n)
+    if total_value > 0:
+        for i in range(n):
+            weight[i] = market_value[i] / total_value
+    return market_value, unrealized_pl, unrealized_pl_pct, weight, total_value, total_cost
+
+def _returns_6mo(tickers, stats):
+    """6-month returns for tickers as an array (-inf where stats are missing)."""
+    return np.array([stats[t]['return_6mo'] if t in stats else -np.inf for t in tickers], dtype=np.float64)
+
 def analyze_portfolio(portfolio_path):
     try:
         with open(portfolio_path, 'r') as f:
@@ -94,63 +216,60 @@ def analyze_portfolio(portfolio_path):
         return {"error": "Empty portfolio"}
 
     portfolio_tickers = [h['ticker'] for h in holdings]
+    portfolio_set = set(portfolio_tickers)
     
     # 1. Gather all unique tickers involved (Holdings + Potential Peers + Themes)
-    # Actually, let's just fetch holdings first to save time, then fetch peers on demand
+    # and fetch them in a single batched download. Losers' sectors aren't known
+    # until the holdings are fetched, so every peer list is included up front.
+    # Peers and themes only need returns, so sectors are looked up for holdings only.
+    universe = set(portfolio_set)
+    for peers in SECTOR_PEERS.values():
+        universe.update(peers)
+    for theme_tickers in THEMES.values():
+        universe.update(theme_tickers)
     
-    # Fetch stats for holdings
-    holding_stats = get_performance_stats(portfolio_tickers)
-    
-    portfolio_data = []
-    total_value = 0.0
-    total_cost = 0.0
+    all_stats = get_performance_stats(sorted(universe), sector_tickers=portfolio_tickers)
+    holding_stats = {t: all_stats[t] for t in portfolio_tickers if t in all_stats}
     
     suggestions = []
 
-    # --- Portfolio Analysis Loop ---
-    for item in holdings:
-        ticker = item['ticker']
-        quantity = item['quantity']
-        cost_basis = item['cost_basis']
-        
-        stats = holding_stats.get(ticker, {})
-        current_price = stats.get('price', 0)
-        
-        market_value = quantity * current_price
-        
-        unrealized_pl = market_value - (quantity * cost_basis)
-        unrealized_pl_pct = (unrealized_pl / (quantity * cost_basis)) * 100 if cost_basis > 0 else 0
-        
-        portfolio_data.append({
-            "ticker": ticker,
-            "quantity": quantity,
-            "cost_basis": cost_basis,
-            "current_price": round(current_price, 2),
-            "market_value": round(market_value, 2),
-            "unrealized_pl": round(unrealized_pl, 2),
-            "unrealized_pl_pct": round(unrealized_pl_pct, 2),
-            "sector": stats.get('sector', 'Unknown'),
-            "return_6mo": stats.get('return_6mo', 0)
-        })
-        
-        total_value += market_value
-        total_cost += (quantity * cost_basis)
-        
-        # Basic Suggestions
-        # 1. Stop Loss
-        if unrealized_pl_pct < -15:
+    # --- Portfolio Analysis (vectorized over holdings) ---
+    n = len(holdings)
+    quantity = np.fromiter((h['quantity'] for h in holdings), dtype=np.float64, count=n)
+    cost_basis = np.fromiter((h['cost_basis'] for h in holdings), dtype=np.float64, count=n)
+    current_price = np.fromiter((holding_stats.get(t, {}).get('price', 0.0) for t in portfolio_tickers), dtype=np.float64, count=n)
+    
+    market_value, unrealized_pl, unrealized_pl_pct, weight, total_value, total_cost = \
+        _portfolio_stats(quantity, cost_basis, current_price)
+    
+    portfolio_data = [{
+        "ticker": item['ticker'],
+        "quantity": item['quantity'],
+        "cost_basis": item['cost_basis'],
+        "current_price": round(float(current_price[i]), 2),
+        "market_value": round(float(market_value[i]), 2),
+        "unrealized_pl": round(float(unrealized_pl[i]), 2),
+        "unrealized_pl_pct": round(float(unrealized_pl_pct[i]), 2),
+        "sector": holding_stats.get(item['ticker'], {}).get('sector', 'Unknown'),
+        "return_6mo": holding_stats.get(item['ticker'], {}).get('return_6mo', 0)
+    } for i, item in enumerate(holdings)]
+    
+    # Basic Suggestions
+    # 1. Stop Loss / 2. Profit Taking (in holding order)
+    for i in np.flatnonzero((unrealized_pl_pct < -15) | (unrealized_pl_pct > 50)):
+        ticker = portfolio_tickers[i]
+        pct = float(unrealized_pl_pct[i])
+        if pct < -15:
             suggestions.append({
                 "type": "warning",
                 "ticker": ticker,
-                "message": f"Stop loss warning: {ticker} is down {round(unrealized_pl_pct, 1)}%."
+                "message": f"Stop loss warning: {ticker} is down {round(pct, 1)}%."
             })
-        
-        # 2. Profit Taking
-        if unrealized_pl_pct > 50:
-             suggestions.append({
+        else:
+            suggestions.append({
                 "type": "opportunity",
                 "ticker": ticker,
-                "message": f"Profit taking: {ticker} is up {round(unrealized_pl_pct, 1)}%. Consider trimming."
+                "message": f"Profit taking: {ticker} is up {round(pct, 1)}%. Consider trimming."
             })
 
     # Portfolio Level Metrics
@@ -164,71 +283,53 @@ def analyze_portfolio(portfolio_path):
     losers = [p for p in portfolio_data if p['unrealized_pl_pct'] < 0]
     
     if losers:
-        # Collect potential peers
-        peers_to_check = set()
+        # Peer stats were fetched with the holdings above
+        peer_stats = all_stats
+        
+        # Peers per sector that aren't already held (don't compare with self)
+        sector_peers_avail = {
+            s: tuple(c for c in peers if c not in portfolio_set)
+            for s, peers in SECTOR_PEERS.items()
+        }
+        
         for loser in losers:
             sector = loser['sector']
+            loser_ret6m = loser['return_6mo']
+            
             # Find peers in that sector from our hardcoded list
             # In a full app, we'd query a DB
-            candidates = SECTOR_PEERS.get(sector, [])
-            for c in candidates: 
-                if c not in portfolio_tickers: # Don't compare with self
-                    peers_to_check.add(c)
-        
-        if peers_to_check:
-             peer_stats = get_performance_stats(list(peers_to_check))
-             
-             for loser in losers:
-                 sector = loser['sector']
-                 loser_ret6m = loser['return_6mo']
-                 
-                 candidates = SECTOR_PEERS.get(sector, [])
-                 best_peer = None
-                 best_peer_ret = -999
-                 
-                 for c in candidates:
-                     if c in peer_stats:
-                         c_ret = peer_stats[c].get('return_6mo', -999)
-                         # Simple logic: If peer has > 20% better momentum
-                         if c_ret > (loser_ret6m + 0.20): 
-                             if c_ret > best_peer_ret:
-                                 best_peer = c
-                                 best_peer_ret = c_ret
-                                 
-                 if best_peer:
-                     suggestions.append({
-                         "type": "swap_opportunity",
-                         "ticker": loser['ticker'],
-                         "message": f"Swap Opportunity: {loser['ticker']} ({round(loser_ret6m*100,1)}% 6mo) is lagging {best_peer} ({round(best_peer_ret*100,1)}% 6mo) in {sector}."
-                     })
+            candidates = sector_peers_avail.get(sector, ())
+            if not candidates: continue
+            
+            # Simple logic: best peer among those with > 20% better momentum
+            rets = _returns_6mo(candidates, peer_stats)
+            better = rets > (loser_ret6m + 0.20)
+            if better.any():
+                i = int(np.argmax(np.where(better, rets, -np.inf)))
+                best_peer = candidates[i]
+                best_peer_ret = float(rets[i])
+                
+                suggestions.append({
+                    "type": "swap_opportunity",
+                    "ticker": loser['ticker'],
+                    "message": f"Swap Opportunity: {loser['ticker']} ({round(loser_ret6m*100,1)}% 6mo) is lagging {best_peer} ({round(best_peer_ret*100,1)}% 6mo) in {sector}."
+                })
 
 
     # --- Advanced Feature 2: Market Opportunities (Themes) ---
     for theme, tickers in THEMES.items():
         # Check exposure
-        has_exposure = any(t in portfolio_tickers for t in tickers)
+        has_exposure = not portfolio_set.isdisjoint(tickers)
         
         if not has_exposure:
             # Find best performer in theme to suggest
-            # We need to fetch stats for these if we haven't already
-            missing_tickers = [t for t in tickers if t not in holding_stats and t not in portfolio_tickers]
+            # (theme stats were fetched with the holdings above)
+            rets = _returns_6mo(tickers, all_stats)
+            i = int(np.argmax(rets))
+            best_theme_stock = tickers[i]
+            best_ret = float(rets[i])
             
-            # Fetch batch
-            theme_stats = get_performance_stats(missing_tickers)
-            
-            best_theme_stock = None
-            best_ret = -999
-            
-            for t in tickers:
-                # Combine sources
-                stats = holding_stats.get(t) or theme_stats.get(t)
-                if stats:
-                    ret = stats.get('return_6mo', -999)
-                    if ret > best_ret:
-                        best_ret = ret
-                        best_theme_stock = t
-            
-            if best_theme_stock and best_ret > 0.10: # Only suggest if positive momentum
+            if best_ret > 0.10: # Only suggest if positive momentum
                  suggestions.append({
                      "type": "new_opportunity",
                      "ticker": best_theme_stock,
@@ -236,14 +337,13 @@ def analyze_portfolio(portfolio_path):
                  })
 
     # --- Concentration Check ---
-    for item in portfolio_data:
-         weight = item['market_value'] / total_value if total_value > 0 else 0
-         if weight > 0.20:
-            suggestions.append({
-                "type": "risk",
-                "ticker": item['ticker'],
-                "message": f"Concentration risk: {item['ticker']} makes up {round(weight*100, 1)}% of portfolio (>20%)."
-            })
+    for i in np.flatnonzero(weight > 0.20):
+        ticker = portfolio_tickers[i]
+        suggestions.append({
+            "type": "risk",
+            "ticker": ticker,
+            "message": f"Concentration risk: {ticker} makes up {round(float(weight[i])*100, 1)}% of portfolio (>20%)."
+        })
 
     return {
         "summary": {
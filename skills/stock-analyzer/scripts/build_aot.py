@@ -0,0 +1,42 @@
+"""
+Ahead-of-time compile the indicator kernels (main.py, technical/kernels.py)
+with numba.pycc.
+
+With @njit(cache=True) the kernels are compiled on the first run and cached
+under __pycache__; this script moves that cost to install time instead:
+
+    python3 build_aot.py
+
+It writes an _indicator_kernels extension module next to main.py, which
+main.py imports when present (falling back to the @njit kernels otherwise).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils._njit import NUMBA_AVAILABLE
+
+if not NUMBA_AVAILABLE:
+    sys.exit("numba is required to build the AOT kernels: pip install numba")
+
+from numba.pycc import CC
+
+# Hide a previous build so main binds its @njit kernels (which have .py_func)
+sys.modules['_indicator_kernels'] = None
+import main
+import technical.kernels
+
+cc = CC('_indicator_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Signatures match how calculate_rsi/macd/bollinger_bands call the kernels
+cc.export('rsi_kernel', 'f8[:](f8[:], i8)')(technical.kernels.rsi_kernel.py_func)
+cc.export('macd_kernel', 'UniTuple(f8[:], 3)(f8[:], i8, i8, i8)')(main._macd_kernel.py_func)
+cc.export('bbands_kernel', 'UniTuple(f8[:], 3)(f8[:], i8, f8)')(main._bbands_kernel.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built _indicator_kernels in {cc.output_dir}")
@@ -1,7 +1,7 @@
 """Core modules for stock data fetching and caching."""
 
 from .cache import DataCache
-from .market_handler import MarketHandler
+from .market_handler import MarketHandler, MarketConfig
 from .data_fetcher import DataFetcher
 
-__all__ = ['DataCache', 'MarketHandler', 'DataFetcher']
+__all__ = ['DataCache', 'MarketHandler', 'MarketConfig', 'DataFetcher']
@@ -1,18 +1,45 @@
 """File-based caching system with TTL support."""
 
 import json
+import os
 import hashlib
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _loads(raw: bytes) -> Any:
+    """Deserialize JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 class DataCache:
     """
     Simple file-based cache to avoid API rate limits.
 
     Cache keys are hashed from ticker + data_type + parameters.
-    Each cache entry includes data and timestamp for TTL validation.
+    Each cache file holds the data itself; its modification time is the
+    write timestamp used for TTL validation.
     """
 
     def __init__(self, cache_dir: str = './data/cache', ttl_minutes: int = 15):
@@ -28,9 +55,12 @@ class DataCache:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
     def _generate_key(self, *args) -> str:
-        """Generate a unique cache key from arguments."""
-        key_string = '_'.join(str(arg) for arg in args)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        """Generate a unique cache key (16 hex chars) from arguments."""
+        key_string = '_'.join(str(arg) for arg in args).encode()
+        # Non-cryptographic hash is enough for local file names
+        if xxhash is not None:
+            return xxhash.xxh3_64_hexdigest(key_string)
+        return hashlib.blake2b(key_string, digest_size=8).hexdigest()
 
     def _get_cache_path(self, key: str) -> Path:
         """Get the file path for a cache key."""
@@ -49,45 +79,47 @@ class DataCache:
         key = self._generate_key(*args)
         cache_path = self._get_cache_path(key)
 
-        if not cache_path.exists():
-            return None
-
+        # Check expiry from the file's mtime before reading anything
         try:
-            with open(cache_path, 'r') as f:
-                cache_entry = json.load(f)
-
-            # Check if cache is expired
-            cached_time = datetime.fromisoformat(cache_entry['timestamp'])
-            if datetime.now() - cached_time > self.ttl:
-                # Cache expired, delete it
-                cache_path.unlink()
-                return None
+            cached_time = cache_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
 
-            return cache_entry['data']
+        if time.time() - cached_time > self.ttl.total_seconds():
+            # Cache expired, delete it
+            cache_path.unlink(missing_ok=True)
+            return None
 
-        except (json.JSONDecodeError, KeyError, ValueError):
+        try:
+            with open(cache_path, 'rb') as f:
+                return _loads(f.read())
+        except ValueError:
             # Corrupted cache file, delete it
-            cache_path.unlink()
+            cache_path.unlink(missing_ok=True)
             return None
 
     def set(self, *args, data: Any):
         """
-        Store data in cache with timestamp.
+        Store data in cache (the write time is the file's mtime).
 
         Args:
-            *args: Arguments to generate cache key (last arg should be data)
+            *args: Arguments to generate cache key (same as for get())
             data: Data to cache
         """
-        key = self._generate_key(*args[:-1]) if len(args) > 1 else self._generate_key(args[0])
+        key = self._generate_key(*args)
         cache_path = self._get_cache_path(key)
 
-        cache_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'data': data
-        }
-
-        with open(cache_path, 'w') as f:
-            json.dump(cache_entry, f, indent=2)
+        # Write to a temp file and rename it into place, so readers never see
+        # a partially written entry (os.replace is atomic on POSIX and Windows)
+        payload = _dumps(data)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
     def invalidate(self, *args):
         """
@@ -106,22 +138,21 @@ class DataCache:
         """
         Clear cache entries older than specified days.
 
+        Files are aged by modification time, which set() bumps on every
+        write, so entries don't need to be opened and parsed.
+
         Args:
             days: Remove cache files older than this many days
         """
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
 
         for cache_file in self.cache_dir.glob('*.json'):
             try:
-                with open(cache_file, 'r') as f:
-                    cache_entry = json.load(f)
-                    cached_time = datetime.fromisoformat(cache_entry['timestamp'])
-
-                    if cached_time < cutoff:
-                        cache_file.unlink()
-            except (json.JSONDecodeError, KeyError, ValueError):
-                # Corrupted file, delete it
-                cache_file.unlink()
+                if cache_file.stat().st_mtime < cutoff:
+                    cache_file.unlink()
+            except FileNotFoundError:
+                # Removed concurrently
+                pass
 
     def clear_all(self):
         """Clear all cache files."""
@@ -1,14 +1,19 @@
 """Multi-source data fetching with caching and fallback logic."""
 
-import json
 import urllib.request
 from datetime import datetime
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
+import numpy as np
 import pandas as pd
 
-from .cache import DataCache
+from .cache import DataCache, _loads
 from .market_handler import MarketHandler
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
 
 class DataFetcher:
     """
@@ -21,6 +26,9 @@ class DataFetcher:
     4. Error (no mock data in production)
     """
 
+    # HTTP session shared by all instances so keep-alive connections are reused
+    _session = None
+
     def __init__(self, cache_dir: str = './data/cache', cache_ttl: int = 15):
         """
         Initialize the data fetcher.
@@ -47,7 +55,7 @@ class DataFetcher:
         Raises:
             Exception if all data sources fail
         """
-        ticker = self.market_handler.normalize_ticker(ticker)
+        ticker, _, _ = self.market_handler.classify(ticker)
 
         # Level 1: Try cache
         cache_key = f"{ticker}_{period}_{interval}"
@@ -61,7 +69,10 @@ class DataFetcher:
             data = self._fetch_with_yfinance(ticker, period, interval)
             data['metadata']['cached'] = False
             data['metadata']['source'] = 'yfinance'
-            self.cache.set(cache_key, data=data)
+            # The raw DataFrame isn't JSON-serializable; get_dataframe()
+            # rebuilds it from history/timestamps on a cache hit
+            cache_payload = {k: v for k, v in data.items() if k != 'dataframe'}
+            self.cache.set(cache_key, data=cache_payload)
             return data
         except Exception as e:
             error_msg = str(e)
@@ -124,44 +135,38 @@ class DataFetcher:
         info = stock.info
 
         # Extract market configuration
-        market_config = self.market_handler.get_market_config(ticker)
+        _, market, market_config = self.market_handler.classify(ticker)
+
+        # Prepare historical data (already rounded, NaN masked to None)
+        bar_dates = hist.index.tz_localize(None).normalize()
+        history = self._history_records(bar_dates, hist)
+        last_bar = history[-1]
 
         # Prepare response
         current_price = info.get('regularMarketPrice') or info.get('currentPrice')
-        if current_price is None and not hist.empty:
-            current_price = float(hist['Close'].iloc[-1])
-
-        # Prepare historical data
-        history = []
-        for date, row in hist.iterrows():
-            history.append({
-                'date': date.strftime('%Y-%m-%d') if hasattr(date, 'strftime') else str(date),
-                'open': round(float(row['Open']), 2) if pd.notna(row['Open']) else None,
-                'high': round(float(row['High']), 2) if pd.notna(row['High']) else None,
-                'low': round(float(row['Low']), 2) if pd.notna(row['Low']) else None,
-                'close': round(float(row['Close']), 2) if pd.notna(row['Close']) else None,
-                'volume': int(row['Volume']) if pd.notna(row['Volume']) else None
-            })
+        if current_price is None:
+            current_price = last_bar['close']
 
         return {
             'metadata': {
                 'ticker': ticker,
-                'market': self.market_handler.detect_market(ticker),
+                'market': market,
                 'timestamp': datetime.now().isoformat(),
-                'currency': market_config['currency'],
+                'currency': market_config.currency,
                 'period': period,
                 'interval': interval
             },
             'price': {
                 'current': round(current_price, 2) if current_price else None,
-                'open': round(float(hist['Open'].iloc[-1]), 2) if not hist.empty and pd.notna(hist['Open'].iloc[-1]) else None,
-                'high': round(float(hist['High'].iloc[-1]), 2) if not hist.empty and pd.notna(hist['High'].iloc[-1]) else None,
-                'low': round(float(hist['Low'].iloc[-1]), 2) if not hist.empty and pd.notna(hist['Low'].iloc[-1]) else None,
-                'volume': int(hist['Volume'].iloc[-1]) if not hist.empty and pd.notna(hist['Volume'].iloc[-1]) else None,
+                'open': last_bar['open'],
+                'high': last_bar['high'],
+                'low': last_bar['low'],
+                'volume': last_bar['volume'],
                 'change': None,  # Calculate if previous close available
                 'change_pct': None
             },
             'history': history,
+            'timestamps': self._epoch_seconds(bar_dates),
             'dataframe': hist  # Keep for technical analysis
         }
 
@@ -193,10 +198,16 @@ class DataFetcher:
         range_param = range_map.get(period, '1mo')
 
         url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?interval=1d&range={range_param}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
 
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
+        session = self._get_session()
+        if session is not None:
+            response = session.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+            response.raise_for_status()
+            data = _loads(response.content)
+        else:
+            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+            with urllib.request.urlopen(req, timeout=10) as response:
+                data = _loads(response.read())
 
         result = data.get('chart', {}).get('result', [])[0]
         meta = result.get('meta', {})
@@ -204,35 +215,27 @@ class DataFetcher:
         indicators = result.get('indicators', {}).get('quote', [{}])[0]
 
         # Extract market configuration
-        market_config = self.market_handler.get_market_config(ticker)
-
-        # Prepare historical data
-        history = []
-        closes = indicators.get('close', [])
-        opens = indicators.get('open', [])
-        highs = indicators.get('high', [])
-        lows = indicators.get('low', [])
-        volumes = indicators.get('volume', [])
-
-        for i in range(len(timestamps)):
-            if closes[i] is not None:
-                history.append({
-                    'date': datetime.fromtimestamp(timestamps[i]).strftime('%Y-%m-%d'),
-                    'open': round(opens[i], 2) if opens[i] else None,
-                    'high': round(highs[i], 2) if highs[i] else None,
-                    'low': round(lows[i], 2) if lows[i] else None,
-                    'close': round(closes[i], 2),
-                    'volume': volumes[i] if volumes[i] else None
-                })
+        _, market, market_config = self.market_handler.classify(ticker)
+
+        # Prepare historical data (bars without a close are skipped)
+        ohlcv = pd.DataFrame({
+            column: np.array(indicators.get(column.lower(), []), dtype=np.float64)
+            for column in ('Open', 'High', 'Low', 'Close', 'Volume')
+        })
+        ohlcv = ohlcv[ohlcv['Close'].notna()]
+        # Bar timestamps are UTC; gmtoffset shifts them to the exchange's local date
+        bar_times = np.asarray(timestamps, dtype=np.int64)[ohlcv.index] + meta.get('gmtoffset', 0)
+        bar_dates = pd.to_datetime(bar_times, unit='s').normalize()
+        history = self._history_records(bar_dates, ohlcv)
 
         current_price = meta.get('regularMarketPrice')
 
         return {
             'metadata': {
                 'ticker': meta.get('symbol', ticker),
-                'market': self.market_handler.detect_market(ticker),
+                'market': market,
                 'timestamp': datetime.now().isoformat(),
-                'currency': market_config['currency'],
+                'currency': market_config.currency,
                 'period': period,
                 'interval': '1d'
             },
@@ -245,9 +248,45 @@ class DataFetcher:
                 'change': None,
                 'change_pct': None
             },
-            'history': history
+            'history': history,
+            'timestamps': self._epoch_seconds(bar_dates)
         }
 
+    @classmethod
+    def _get_session(cls):
+        """
+        Get the shared requests session, creating it on first use.
+
+        Returns:
+            requests.Session, or None if requests is not installed
+        """
+        if cls._session is None and requests is not None:
+            cls._session = requests.Session()
+        return cls._session
+
+    @staticmethod
+    def _history_records(dates: pd.DatetimeIndex, ohlcv: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert OHLCV bars to history records in one vectorized pass.
+
+        Args:
+            dates: Bar dates aligned with the rows of ohlcv
+            ohlcv: DataFrame with Open, High, Low, Close, Volume columns
+
+        Returns:
+            List of dicts with date, open, high, low, close, volume (NaN as None)
+        """
+        frame = ohlcv[['Open', 'High', 'Low', 'Close']].astype(np.float64).round(2)
+        frame.columns = ['open', 'high', 'low', 'close']
+        frame['volume'] = np.trunc(ohlcv['Volume']).astype('Int64')
+        frame.insert(0, 'date', np.asarray(dates.strftime('%Y-%m-%d')))
+        return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+    @staticmethod
+    def _epoch_seconds(dates: pd.DatetimeIndex) -> List[int]:
+        """Bar dates as epoch seconds, so get_dataframe can skip parsing date strings."""
+        return dates.values.astype('datetime64[s]').astype(np.int64).tolist()
+
     def get_dataframe(self, ticker: str, period: str = '1mo') -> Optional[pd.DataFrame]:
         """
         Get historical data as pandas DataFrame for technical analysis.
@@ -271,8 +310,13 @@ class DataFetcher:
         # Otherwise, convert history to dataframe
         if 'history' in data and data['history']:
             df = pd.DataFrame(data['history'])
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
+            dates = df.pop('date')
+            if 'timestamps' in data:
+                df.index = pd.to_datetime(np.asarray(data['timestamps'], dtype=np.int64), unit='s')
+            else:
+                # Entries cached before timestamps were stored
+                df.index = pd.to_datetime(dates, format='%Y-%m-%d')
+            df.index.name = 'date'
             df.rename(columns={
                 'open': 'Open',
                 'high': 'High',
@@ -0,0 +1,49 @@
+"""JSON layout of cached price history, shared by the stock-analyzer and trading-strategy skills."""
+
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# Both skills read and write these entries with the key (ticker, period, interval),
+# so the layout below is the single definition of what a history entry holds
+HISTORY_CACHE_DIR = './data/cache/history'
+HISTORY_CACHE_TTL = 15  # minutes
+HISTORY_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def history_to_json(hist: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Encode an OHLCV frame for DataCache.
+
+    Args:
+        hist: Price history with a DatetimeIndex and the HISTORY_COLUMNS
+
+    Returns:
+        Dict of epoch-ns timestamps, the index's timezone and per-column value lists
+    """
+    return {
+        'timestamps': hist.index.as_unit('ns').asi8.tolist(),
+        'tz': str(hist.index.tz) if hist.index.tz is not None else None,
+        'columns': {k: hist[k].to_numpy(dtype=np.float64).tolist() for k in HISTORY_COLUMNS}
+    }
+
+
+def history_from_json(cached: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Rebuild the frame written by history_to_json.
+
+    Args:
+        cached: Entry as returned by DataCache.get()
+
+    Returns:
+        float64 OHLCV frame indexed by 'Date', with attrs['cached'] set
+    """
+    tz = cached['tz']
+    index = pd.to_datetime(cached['timestamps'], unit='ns', utc=tz is not None)
+    if tz is not None:
+        index = index.tz_convert(tz)
+    columns = {k: np.asarray(v, dtype=np.float64) for k, v in cached['columns'].items()}
+    hist = pd.DataFrame(columns, index=index.rename('Date'))
+    hist.attrs['cached'] = True
+    return hist
@@ -1,6 +1,33 @@
 """Market detection and configuration for different stock exchanges."""
 
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+_HK_SUFFIXES = ('.HK',)
+_CN_SUFFIXES = ('.SS', '.SZ')  # Shanghai, Shenzhen
+_CRYPTO_SUFFIXES = ('-USD', '-BTC', '-ETH')
+
+
+class MarketConfig(NamedTuple):
+    """Static configuration for one market."""
+
+    name: str
+    timezone: str
+    currency: str
+    trading_hours: str
+    suffixes: Tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def _detect_market(ticker_upper: str) -> str:
+    """Memoized suffix match for an uppercased ticker (see MarketHandler.detect_market)."""
+    if ticker_upper.endswith(_HK_SUFFIXES):
+        return 'hong_kong'
+    if ticker_upper.endswith(_CN_SUFFIXES):
+        return 'china_a_shares'
+    if ticker_upper.endswith(_CRYPTO_SUFFIXES):
+        return 'crypto'
+    return 'us'
 
 
 class MarketHandler:
@@ -14,35 +41,35 @@ class MarketHandler:
     - Cryptocurrencies (-USD)
     """
 
-    MARKET_CONFIGS = {
-        'us': {
-            'name': 'US Market',
-            'timezone': 'America/New_York',
-            'currency': 'USD',
-            'trading_hours': '09:30-16:00',
-            'suffixes': []
-        },
-        'hong_kong': {
-            'name': 'Hong Kong Stock Exchange',
-            'timezone': 'Asia/Hong_Kong',
-            'currency': 'HKD',
-            'trading_hours': '09:30-16:00',
-            'suffixes': ['.HK']
-        },
-        'china_a_shares': {
-            'name': 'China A-Shares',
-            'timezone': 'Asia/Shanghai',
-            'currency': 'CNY',
-            'trading_hours': '09:30-15:00',
-            'suffixes': ['.SS', '.SZ']  # Shanghai, Shenzhen
-        },
-        'crypto': {
-            'name': 'Cryptocurrency',
-            'timezone': 'UTC',
-            'currency': 'USD',
-            'trading_hours': '24/7',
-            'suffixes': ['-USD', '-BTC', '-ETH']
-        }
+    MARKET_CONFIGS: Dict[str, MarketConfig] = {
+        'us': MarketConfig(
+            name='US Market',
+            timezone='America/New_York',
+            currency='USD',
+            trading_hours='09:30-16:00',
+            suffixes=()
+        ),
+        'hong_kong': MarketConfig(
+            name='Hong Kong Stock Exchange',
+            timezone='Asia/Hong_Kong',
+            currency='HKD',
+            trading_hours='09:30-16:00',
+            suffixes=_HK_SUFFIXES
+        ),
+        'china_a_shares': MarketConfig(
+            name='China A-Shares',
+            timezone='Asia/Shanghai',
+            currency='CNY',
+            trading_hours='09:30-15:00',
+            suffixes=_CN_SUFFIXES
+        ),
+        'crypto': MarketConfig(
+            name='Cryptocurrency',
+            timezone='UTC',
+            currency='USD',
+            trading_hours='24/7',
+            suffixes=_CRYPTO_SUFFIXES
+        )
     }
 
     @classmethod
@@ -66,25 +93,23 @@ class MarketHandler:
             >>> MarketHandler.detect_market('BTC-USD')
             'crypto'
         """
-        ticker_upper = ticker.upper()
+        return _detect_market(ticker.upper())
 
-        # Check Hong Kong
-        if ticker_upper.endswith('.HK'):
-            return 'hong_kong'
-
-        # Check China A-shares
-        if ticker_upper.endswith('.SS') or ticker_upper.endswith('.SZ'):
-            return 'china_a_shares'
+    @classmethod
+    def classify(cls, ticker: str) -> Tuple[str, str, MarketConfig]:
+        """
+        Normalize a ticker and resolve its market in one pass.
 
-        # Check Crypto
-        if any(suffix in ticker_upper for suffix in ['-USD', '-BTC', '-ETH']):
-            return 'crypto'
+        Args:
+            ticker: Stock ticker symbol
 
-        # Default to US market
-        return 'us'
+        Returns:
+            Tuple of (normalized ticker, market identifier, MarketConfig)
+        """
+        return _classify(ticker)
 
     @classmethod
-    def get_market_config(cls, ticker: str) -> Dict[str, Any]:
+    def get_market_config(cls, ticker: str) -> MarketConfig:
         """
         Get market-specific configuration for a ticker.
 
@@ -92,10 +117,9 @@ class MarketHandler:
             ticker: Stock ticker symbol
 
         Returns:
-            Dictionary with market configuration (name, timezone, currency, etc.)
+            MarketConfig with name, timezone, currency, trading_hours, suffixes
         """
-        market = cls.detect_market(ticker)
-        return cls.MARKET_CONFIGS.get(market, cls.MARKET_CONFIGS['us'])
+        return cls.MARKET_CONFIGS[_detect_market(ticker.upper())]
 
     @classmethod
     def get_currency(cls, ticker: str) -> str:
@@ -108,8 +132,7 @@ class MarketHandler:
         Returns:
             Currency code (USD, HKD, CNY, etc.)
         """
-        config = cls.get_market_config(ticker)
-        return config['currency']
+        return cls.get_market_config(ticker).currency
 
     @classmethod
     def get_timezone(cls, ticker: str) -> str:
@@ -122,8 +145,7 @@ class MarketHandler:
         Returns:
             Timezone string (e.g., 'America/New_York')
         """
-        config = cls.get_market_config(ticker)
-        return config['timezone']
+        return cls.get_market_config(ticker).timezone
 
     @classmethod
     def normalize_ticker(cls, ticker: str) -> str:
@@ -151,3 +173,11 @@ class MarketHandler:
         """
         market = cls.detect_market(ticker)
         return market in ['hong_kong', 'china_a_shares']
+
+
+@lru_cache(maxsize=8192)
+def _classify(ticker: str) -> Tuple[str, str, MarketConfig]:
+    """Memoized normalize + detect + config lookup (see MarketHandler.classify)."""
+    normalized = ticker.upper().strip()
+    market = _detect_market(normalized)
+    return normalized, market, MarketHandler.MARKET_CONFIGS[market]
@@ -4,61 +4,200 @@ import argparse
 from datetime import datetime
 import tempfile
 import os
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import numpy as np
 
+# Optional dependencies are resolved once at import; functions check for None
+try:
+    import yfinance as yf
+    _YF_IMPORT_ERROR = None
+except ImportError as e:
+    yf = None
+    _YF_IMPORT_ERROR = str(e)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+# VADER is a plain lexicon lookup (no POS tagging); TextBlob remains the fallback
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    _VADER = SentimentIntensityAnalyzer()
+except ImportError:
+    _VADER = None
+
+TextBlob = None
+if _VADER is None:
+    try:
+        from textblob import TextBlob
+    except ImportError:
+        pass
+
+# Numba is optional; without it the kernels below run as plain Python
+from utils._njit import njit
+from core.cache import DataCache
+from core.history_cache import HISTORY_CACHE_DIR, HISTORY_CACHE_TTL, history_to_json, history_from_json
+from technical.kernels import rsi_kernel as _rsi_kernel
+
+def calculate_sma(data, window):
+    """Calculates a simple moving average (NaN until a full window)."""
+    if window > len(data):
+        # e.g. SMA 200 on a short history: nothing to compute
+        return pd.Series(np.nan, index=data.index)
+    if bn is None:
+        return data.rolling(window=window).mean()
+    # bottleneck keeps a running sum, O(N) regardless of window size
+    return pd.Series(bn.move_mean(data.to_numpy(dtype=np.float64), window, min_count=window), index=data.index)
+
 def calculate_rsi(data, window=14):
-    """Calculates RSI on a pandas Series."""
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    """Calculates RSI on a pandas Series (Wilder's smoothing)."""
+    close = data.to_numpy(dtype=np.float64)
+    if close.size <= window:
+        return pd.Series(np.nan, index=data.index)
+    return pd.Series(_rsi_kernel(close, window), index=data.index)
+
+@njit(cache=True)
+def _macd_kernel(close, fast, slow, signal):
+    """Fast/slow/signal EMAs (adjust=False recurrences) fused into one pass."""
+    n = close.size
+    macd = np.empty(n)
+    signal_line = np.empty(n)
+    histogram = np.empty(n)
+    kf = 2.0 / (fast + 1)
+    ks = 2.0 / (slow + 1)
+    kg = 2.0 / (signal + 1)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    sig = 0.0
+    for i in range(n):
+        x = close[i]
+        if x == x:  # NaN bars carry the previous state forward
+            ema_fast = kf * x + (1 - kf) * ema_fast
+            ema_slow = ks * x + (1 - ks) * ema_slow
+            sig = kg * (ema_fast - ema_slow) + (1 - kg) * sig
+        macd[i] = ema_fast - ema_slow
+        signal_line[i] = sig
+        histogram[i] = macd[i] - sig
+    return macd, signal_line, histogram
 
 def calculate_macd(data, slow=26, fast=12, signal=9):
     """Calculates MACD, Signal, and Histogram."""
-    exp1 = data.ewm(span=fast, adjust=False).mean()
-    exp2 = data.ewm(span=slow, adjust=False).mean()
-    macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    histogram = macd - signal_line
-    return macd, signal_line, histogram
+    close = data.to_numpy(dtype=np.float64)
+    if close.size == 0:
+        empty = pd.Series(dtype=np.float64, index=data.index)
+        return empty, empty.copy(), empty.copy()
+    return tuple(pd.Series(arr, index=data.index) for arr in _macd_kernel(close, fast, slow, signal))
+
+@njit(cache=True)
+def _bbands_kernel(close, window, num_std):
+    """Rolling mean/std (ddof=1) bands from running sum and sum of squares."""
+    n = close.size
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    # Sums are taken around the first valid close to limit cancellation in var
+    ref = 0.0
+    for i in range(n):
+        if close[i] == close[i]:
+            ref = close[i]
+            break
+    s = 0.0
+    s2 = 0.0
+    nans = 0  # NaNs inside the window; any makes the band NaN, as in pandas
+    for i in range(n):
+        x = close[i] - ref
+        if x == x:
+            s += x
+            s2 += x * x
+        else:
+            nans += 1
+        if i >= window:
+            old = close[i - window] - ref
+            if old == old:
+                s -= old
+                s2 -= old * old
+            else:
+                nans -= 1
+        if i >= window - 1 and nans == 0:
+            mean = s / window
+            var = (s2 - s * mean) / (window - 1)
+            sd = np.sqrt(var) if var > 0 else 0.0
+            middle[i] = mean + ref
+            upper[i] = middle[i] + num_std * sd
+            lower[i] = middle[i] - num_std * sd
+    return upper, middle, lower
 
 def calculate_bollinger_bands(data, window=20, num_std=2):
     """Calculates Bollinger Bands (Upper, Middle, Lower)."""
-    sma = data.rolling(window=window).mean()
-    std = data.rolling(window=window).std()
-    upper = sma + (std * num_std)
-    lower = sma - (std * num_std)
-    return upper, sma, lower
+    close = data.to_numpy(dtype=np.float64)
+    return tuple(pd.Series(arr, index=data.index) for arr in _bbands_kernel(close, window, float(num_std)))
+
+# Prefer the kernels precompiled by build_aot.py (no JIT compile on a cold start)
+try:
+    from _indicator_kernels import rsi_kernel as _rsi_kernel
+    from _indicator_kernels import macd_kernel as _macd_kernel
+    from _indicator_kernels import bbands_kernel as _bbands_kernel
+except ImportError:
+    pass
 
 def analyze_sentiment(text):
     """
     Returns polarity (-1 to 1) and subjectivity (0 to 1).
+    With VADER, polarity is the compound score and subjectivity the non-neutral share.
     """
-    try:
-        from textblob import TextBlob
-        blob = TextBlob(text)
-        return blob.sentiment.polarity, blob.sentiment.subjectivity
-    except ImportError:
+    if _VADER is not None:
+        scores = _VADER.polarity_scores(text)
+        return scores['compound'], 1 - scores['neu']
+    if TextBlob is None:
         return None, None
+    blob = TextBlob(text)
+    return blob.sentiment.polarity, blob.sentiment.subjectivity
+
+def analyze_sentiment_batch(texts):
+    """
+    Scores a list of headlines, one analyze_sentiment call per headline.
+    Neither VADER nor TextBlob has a batch API, so this is a plain loop over the
+    module-level analyzer; it only saves callers from building the arrays.
+    Returns (polarities, subjectivities) float arrays, or (None, None) with no analyzer.
+    """
+    if _VADER is None and TextBlob is None:
+        return None, None
+    scores = np.array([analyze_sentiment(text) for text in texts], dtype=np.float64).reshape(-1, 2)
+    return scores[:, 0], scores[:, 1]
+
+@lru_cache(maxsize=1)
+def _chart_style():
+    """Build the mplfinance style once per process instead of once per chart."""
+    import mplfinance as mpf
+    return mpf.make_mpf_style(base_mpf_style='yahoo')
+
+# Columns generate_chart_image actually plots (OHLCV + overlays/panels)
+_CHART_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume', 'SMA_50', 'SMA_200',
+                  'BBU_20_2.0', 'BBL_20_2.0', 'RSI_14', 'MACD', 'MACD_Signal', 'MACD_Hist')
 
 def generate_chart_image(ticker, hist):
     """
     Generates a multi-panel candlestick chart (Price, Volume, RSI, MACD).
     """
     try:
+        import matplotlib
+        matplotlib.use('Agg')  # file output only; skips GUI backend probing
         import mplfinance as mpf
         
-        # Prepare data frame for mplfinance
-        df = hist.copy()
-        # Ensure capitalization matches what mpf expects
-        df.columns = [c.capitalize() for c in df.columns]
-        
+        # `hist` already has the Open/High/Low/Close/Volume columns mpf expects
         # Create temp file
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{ticker}_{timestamp}_chart.png"
+        # pid + monotonic clock: unique per process without formatting a datetime
+        filename = f"{ticker}_{os.getpid()}_{time.monotonic_ns()}_chart.png"
         filepath = os.path.join(tempfile.gettempdir(), filename)
 
         # Plots to add
@@ -89,9 +228,9 @@ def generate_chart_image(ticker, hist):
         # Plot
         # panel_ratios = (Price, Volume, RSI, MACD)
         mpf.plot(
-            df, 
+            hist, 
             type='candle', 
-            style='yahoo', 
+            style=_chart_style(), 
             volume=True, 
             addplot=add_plots, 
             savefig=filepath,
@@ -108,9 +247,22 @@ def generate_chart_image(ticker, hist):
     except Exception as e:
         return None # Fail silently/gracefully on chart error
 
+def _round_or_none(value, ndigits):
+    """Rounds a float indicator value, mapping NaN (value != value) to None."""
+    return None if value != value else round(float(value), ndigits)
+
+def _int_or_none(value):
+    """Converts a volume to int, mapping NaN (value != value) to None instead of casting it."""
+    return None if value != value else int(value)
+
+def _present(value):
+    """True for a real number: not None (missing key) and not NaN."""
+    return value is not None and value == value
+
 def get_signals(last_row):
     """
     Generates trading signals based on technical indicators.
+    `last_row` is a plain dict of the latest bar's values (column -> float).
     """
     signals = {
         "rsi_signal": "neutral",
@@ -122,14 +274,14 @@ def get_signals(last_row):
     
     # RSI
     rsi = last_row.get('RSI_14')
-    if pd.notnull(rsi):
+    if _present(rsi):
         if rsi > 70: signals['rsi_signal'] = 'overbought'
         elif rsi < 30: signals['rsi_signal'] = 'oversold'
 
     # MACD
     macd = last_row.get('MACD')
     signal = last_row.get('MACD_Signal')
-    if pd.notnull(macd) and pd.notnull(signal):
+    if _present(macd) and _present(signal):
         if macd > signal: signals['macd_signal'] = 'bullish'
         elif macd < signal: signals['macd_signal'] = 'bearish'
 
@@ -137,12 +289,12 @@ def get_signals(last_row):
     price = last_row['Close']
     bb_upper = last_row.get('BBU_20_2.0')
     bb_lower = last_row.get('BBL_20_2.0')
-    if pd.notnull(bb_upper) and price > bb_upper: signals['bb_signal'] = 'overbought'
-    elif pd.notnull(bb_lower) and price < bb_lower: signals['bb_signal'] = 'oversold'
+    if _present(bb_upper) and price > bb_upper: signals['bb_signal'] = 'overbought'
+    elif _present(bb_lower) and price < bb_lower: signals['bb_signal'] = 'oversold'
 
     # Trend (Price vs SMA 50)
     sma_50 = last_row.get('SMA_50')
-    if pd.notnull(sma_50):
+    if _present(sma_50):
         if price > sma_50 * 1.02: signals['trend'] = 'uptrend'
         elif price < sma_50 * 0.98: signals['trend'] = 'downtrend'
 
@@ -167,114 +319,197 @@ def get_signals(last_row):
     
     return signals
 
-def get_stock_data(ticker, period="1mo", interval="1d", technical=False, no_cache=False):
+# Rough output slicing based on trading days per period
+_PERIOD_ROWS = {'5d': 5, '1mo': 22, '3mo': 66, '6mo': 132, '1y': 252, '2y': 504, '5y': 1260}
+
+# Yahoo exchange suffix -> market code (no suffix / unknown suffix -> 'us')
+_SUFFIX_MAP = {'.HK': 'hk', '.SS': 'cn', '.SZ': 'cn', '.L': 'uk'}
+
+# On-disk caches shared across CLI invocations (TTL in minutes per endpoint)
+CACHE_DIR = './data/cache'
+CACHE_TTL = {'history': HISTORY_CACHE_TTL, 'info': 60 * 6, 'news': 15}
+
+@lru_cache(maxsize=None)
+def _file_cache(kind):
+    """DataCache for one endpoint, or None if the cache dir can't be created."""
+    # History lives where core.history_cache says, since trading-strategy reads it too
+    cache_dir = HISTORY_CACHE_DIR if kind == 'history' else os.path.join(CACHE_DIR, kind)
+    try:
+        return DataCache(cache_dir=cache_dir, ttl_minutes=CACHE_TTL[kind])
+    except OSError:
+        return None
+
+def _cache_store(cache, key, data):
+    """Best-effort cache write; a failed write never fails the request."""
+    try:
+        cache.set(*key, data=data)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def _cached_fetch(kind, ticker, fetch, no_cache=False):
+    """Return fetch() through the `kind` file cache (read skipped with no_cache)."""
+    cache = _file_cache(kind)
+    if cache is not None and not no_cache:
+        cached = cache.get(ticker)
+        if cached is not None:
+            return cached
+    value = fetch()
+    if cache is not None and value:
+        _cache_store(cache, (ticker,), value)
+    return value
+
+@lru_cache(maxsize=128)
+def _get_ticker(ticker):
+    """Process-wide yf.Ticker per symbol (it caches info/news itself)."""
+    return yf.Ticker(ticker)
+
+def _fetch_currency(stock):
+    """
+    Quote currency via fast_info, which skips the full fundamentals request behind .info.
+    Returns {} when it can't be fetched, so _cached_fetch doesn't cache a guess;
+    the caller falls back to USD for this run only.
+    """
     try:
-        import yfinance as yf
-    except ImportError as e:
-        return {"error": f"Missing dependency: {str(e)}"}
+        currency = stock.fast_info.get('currency')
+    except Exception:
+        return {}
+    return {'currency': currency} if currency else {}
+
+def _fetch_history(ticker, period, interval, no_cache=False):
+    """Price history from the file cache, else Yahoo (refreshing the cache)."""
+    cache = _file_cache('history')
+    key = (ticker, period, interval)
+    if cache is not None and not no_cache:
+        cached = cache.get(*key)
+        if cached is not None:
+            return history_from_json(cached)
+    hist = _get_ticker(ticker).history(period=period, interval=interval, auto_adjust=True)
+    if cache is not None and not hist.empty:
+        _cache_store(cache, key, history_to_json(hist))
+    return hist
+
+@lru_cache(maxsize=256)
+def _get_history(ticker, period, interval):
+    """Memoized price history; callers must not mutate the returned frame."""
+    return _fetch_history(ticker, period, interval)
+
+def get_stock_data(ticker, period="1mo", interval="1d", technical=False, no_cache=False, chart=True):
+    if yf is None:
+        return {"error": f"Missing dependency: {_YF_IMPORT_ERROR}"}
 
     try:
-        stock = yf.Ticker(ticker)
+        stock = _get_ticker(ticker)
         
         # Fetch extended history for calculations
         # Always fetch at least 1y for decent indicators, unless period is max
         fetch_period = "2y" if period in ["1y", "2y", "5y", "max"] else "1y"
         if period == "max": fetch_period = "max"
         
-        hist = stock.history(period=fetch_period, interval=interval, auto_adjust=True)
+        # History, currency and news are independent round-trips to Yahoo, so overlap them
+        pool = ThreadPoolExecutor(max_workers=3)
+        if no_cache:
+            f_hist = pool.submit(_fetch_history, ticker, fetch_period, interval, no_cache=True)
+        else:
+            f_hist = pool.submit(_get_history, ticker, fetch_period, interval)
+        f_info = pool.submit(_cached_fetch, 'info', ticker, lambda: _fetch_currency(stock), no_cache)
+        f_news = pool.submit(_cached_fetch, 'news', ticker, lambda: stock.news, no_cache)
+        pool.shutdown(wait=False)  # nothing else is queued; the workers just finish these
+        hist = f_hist.result()
         
         if hist.empty:
             return {"error": f"No data found for ticker '{ticker}'"}
 
+        # Work on plain column arrays from here on; `hist` itself is never mutated
+        index = hist.index
+        cols = {k: hist[k].to_numpy() for k in ('Open', 'High', 'Low', 'Close', 'Volume')}
+        close = hist['Close']
+
         # Calculate Indicators Manually (Replacing pandas-ta)
         
         # 1. Moving Averages
-        hist['SMA_20'] = hist['Close'].rolling(window=20).mean()
-        hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
-        hist['SMA_200'] = hist['Close'].rolling(window=200).mean()
+        cols['SMA_20'] = calculate_sma(close, 20).to_numpy()
+        cols['SMA_50'] = calculate_sma(close, 50).to_numpy()
+        cols['SMA_200'] = calculate_sma(close, 200).to_numpy()
         
         # 2. RSI
-        hist['RSI_14'] = calculate_rsi(hist['Close'])
+        cols['RSI_14'] = calculate_rsi(close).to_numpy()
         
         # 3. MACD
-        hist['MACD'], hist['MACD_Signal'], hist['MACD_Hist'] = calculate_macd(hist['Close'])
+        cols['MACD'], cols['MACD_Signal'], cols['MACD_Hist'] = (s.to_numpy() for s in calculate_macd(close))
         
         # 4. Bollinger Bands
-        hist['BBU_20_2.0'], hist['BBM_20_2.0'], hist['BBL_20_2.0'] = calculate_bollinger_bands(hist['Close'])
-
-        # Slice for output
-        if period != "max":
-            # Rough slicing based on trading days
-            days_map = {'5d': 5, '1mo': 22, '3mo': 66, '6mo': 132, '1y': 252, '2y': 504, '5y': 1260}
-            rows = days_map.get(period, 22)
-            output_hist = hist.tail(rows)
-        else:
-            output_hist = hist
+        cols['BBU_20_2.0'], cols['BBM_20_2.0'], cols['BBL_20_2.0'] = (s.to_numpy() for s in calculate_bollinger_bands(close))
+
+        # Slice for output (views into the full-length arrays)
+        rows = len(index) if period == "max" else _PERIOD_ROWS.get(period, 22)
+        output_index = index[-rows:]
+        output = {k: v[-rows:] for k, v in cols.items()}
 
-        # Generate Chart
-        chart_path = generate_chart_image(ticker, output_hist)
+        # Generate Chart (the only consumer that needs a DataFrame) in the
+        # background while signals, history, sentiment and info are assembled
+        f_chart = None
+        if chart:
+            chart_frame = pd.DataFrame({k: output[k] for k in _CHART_COLUMNS}, index=output_index)
+            chart_pool = ThreadPoolExecutor(max_workers=1)
+            f_chart = chart_pool.submit(generate_chart_image, ticker, chart_frame)
+            chart_pool.shutdown(wait=False)
         
         # Signals (based on latest full candle)
-        last_row = hist.iloc[-1]
+        last_row = {k: v[-1] for k, v in cols.items()}
         signals = get_signals(last_row)
 
-        # Format History Output
-        history_list = []
-        for date, row in output_hist.iterrows():
-            item = {
-                "date": date.strftime('%Y-%m-%d'),
-                "open": round(row['Open'], 2),
-                "high": round(row['High'], 2),
-                "low": round(row['Low'], 2),
-                "close": round(row['Close'], 2),
-                "volume": int(row['Volume'])
-            }
-            # Add technicals to history if requested
-            if technical:
-                 if pd.notnull(row.get('RSI_14')): item['rsi_14'] = round(row['RSI_14'], 2)
-                 if pd.notnull(row.get('SMA_50')): item['sma_50'] = round(row['SMA_50'], 2)
-                 if pd.notnull(row.get('SMA_200')): item['sma_200'] = round(row['SMA_200'], 2)
-            history_list.append(item)
+        # Format History Output (column-wise: one numpy pass per field, not per row)
+        dates = output_index.strftime('%Y-%m-%d')
+        opens, highs, lows, closes = (
+            output[col].astype(np.float64).round(2).tolist()
+            for col in ('Open', 'High', 'Low', 'Close')
+        )
+        # Volume can be NaN (e.g. a partial bar); astype(int64) would turn that into INT64_MIN
+        volumes = [_int_or_none(v) for v in output['Volume'].tolist()]
+        history_list = [
+            {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+        ]
+        # Add technicals to history if requested (NaN warm-up values are omitted)
+        if technical:
+            for col, key in (('RSI_14', 'rsi_14'), ('SMA_50', 'sma_50'), ('SMA_200', 'sma_200')):
+                values = output[col]
+                for item, value, valid in zip(history_list, values.round(2).tolist(), ~np.isnan(values)):
+                    if valid: item[key] = value
 
         # Latest Technical Snapshot
         tech_indicators = {
-            "rsi_14": round(last_row['RSI_14'], 2) if pd.notnull(last_row.get('RSI_14')) else None,
+            "rsi_14": _round_or_none(last_row['RSI_14'], 2),
             "macd": {
-                "macd": round(last_row['MACD'], 3) if pd.notnull(last_row.get('MACD')) else None,
-                "signal": round(last_row['MACD_Signal'], 3) if pd.notnull(last_row.get('MACD_Signal')) else None,
-                "histogram": round(last_row['MACD_Hist'], 3) if pd.notnull(last_row.get('MACD_Hist')) else None
+                "macd": _round_or_none(last_row['MACD'], 3),
+                "signal": _round_or_none(last_row['MACD_Signal'], 3),
+                "histogram": _round_or_none(last_row['MACD_Hist'], 3)
             },
-            "bb_upper": round(last_row['BBU_20_2.0'], 2) if pd.notnull(last_row.get('BBU_20_2.0')) else None,
-            "bb_middle": round(last_row['BBM_20_2.0'], 2) if pd.notnull(last_row.get('BBM_20_2.0')) else None,
-            "bb_lower": round(last_row['BBL_20_2.0'], 2) if pd.notnull(last_row.get('BBL_20_2.0')) else None,
-            "sma_20": round(last_row['SMA_20'], 2) if pd.notnull(last_row.get('SMA_20')) else None,
-            "sma_50": round(last_row['SMA_50'], 2) if pd.notnull(last_row.get('SMA_50')) else None,
-            "sma_200": round(last_row['SMA_200'], 2) if pd.notnull(last_row.get('SMA_200')) else None
+            "bb_upper": _round_or_none(last_row['BBU_20_2.0'], 2),
+            "bb_middle": _round_or_none(last_row['BBM_20_2.0'], 2),
+            "bb_lower": _round_or_none(last_row['BBL_20_2.0'], 2),
+            "sma_20": _round_or_none(last_row['SMA_20'], 2),
+            "sma_50": _round_or_none(last_row['SMA_50'], 2),
+            "sma_200": _round_or_none(last_row['SMA_200'], 2)
         }
 
         # News & Sentiment
         news_sentiment = {"average_polarity": 0, "average_subjectivity": 0, "headlines": []}
         try:
-            raw_news = stock.news
-            scores_pol = []
-            scores_sub = []
-            for item in raw_news[:5]:
-                content = item.get('content', item)
-                title = content.get('title')
-                pol, sub = analyze_sentiment(title)
-                
-                if pol is not None:
-                     scores_pol.append(pol)
-                     scores_sub.append(sub)
-                
-                news_sentiment['headlines'].append({
-                    "title": title,
-                    "polarity": round(pol, 2) if pol else 0
-                })
+            raw_news = f_news.result()
+            titles = [item.get('content', item).get('title') for item in raw_news[:5]]
+            polarities, subjectivities = analyze_sentiment_batch(titles)
             
-            if scores_pol:
-                news_sentiment['average_polarity'] = round(sum(scores_pol) / len(scores_pol), 2)
-                news_sentiment['average_subjectivity'] = round(sum(scores_sub) / len(scores_sub), 2)
+            if polarities is None:
+                news_sentiment['headlines'] = [{"title": title, "polarity": 0} for title in titles]
+            else:
+                news_sentiment['headlines'] = [
+                    {"title": title, "polarity": round(pol, 2) if pol else 0}
+                    for title, pol in zip(titles, polarities.tolist())
+                ]
+                if titles:
+                    news_sentiment['average_polarity'] = round(float(polarities.mean()), 2)
+                    news_sentiment['average_subjectivity'] = round(float(subjectivities.mean()), 2)
         except Exception:
             pass
 
@@ -286,18 +521,15 @@ def get_stock_data(ticker, period="1mo", interval="1d", technical=False, no_cach
             "open": round(last_row['Open'], 2),
             "high": round(last_row['High'], 2),
             "low": round(last_row['Low'], 2),
-            "volume": int(last_row['Volume'])
+            "volume": _int_or_none(last_row['Volume'])
         }
 
-        # Metadata / Info
-        info = stock.info or {}
-        currency = info.get('currency', 'USD')
+        # Metadata
+        currency = (f_info.result() or {}).get('currency') or 'USD'
         
-        # Infer market
-        market = 'us'
-        if ticker.endswith('.HK'): market = 'hk'
-        elif ticker.endswith('.SS') or ticker.endswith('.SZ'): market = 'cn'
-        elif ticker.endswith('.L'): market = 'uk'
+        # Infer market from the exchange suffix
+        dot = ticker.rfind('.')
+        market = _SUFFIX_MAP.get(ticker[dot:], 'us') if dot >= 0 else 'us'
         
         return {
             "metadata": {
@@ -305,14 +537,14 @@ def get_stock_data(ticker, period="1mo", interval="1d", technical=False, no_cach
                 "market": market,
                 "currency": currency,
                 "timestamp": datetime.now().isoformat(),
-                "cached": False 
+                "cached": bool(hist.attrs.get('cached', False))
             },
             "price": price_obj,
             "technical": {
                 "indicators": tech_indicators,
                 "signals": signals
             },
-            "chart": chart_path,
+            "chart": f_chart.result() if f_chart is not None else None,
             "news_sentiment": news_sentiment,
             "history": history_list
         }
@@ -327,8 +559,12 @@ if __name__ == "__main__":
     parser.add_argument("--interval", default="1d", help="Data interval (1d, 1wk, 1mo)")
     parser.add_argument("--technical", action="store_true", help="Include technical analysis")
     parser.add_argument("--no-cache", action="store_true", help="Disable caching")
+    parser.add_argument("--no-chart", action="store_true", help="Skip chart generation")
     
     args = parser.parse_args()
     
-    data = get_stock_data(args.ticker, period=args.period, interval=args.interval, technical=args.technical, no_cache=args.no_cache)
-    print(json.dumps(data, indent=2))
+    data = get_stock_data(args.ticker, period=args.period, interval=args.interval, technical=args.technical, no_cache=args.no_cache, chart=not args.no_chart)
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+    else:
+        print(json.dumps(data, indent=2))
@@ -1,9 +1,29 @@
 """Technical indicator calculations using pandas-ta."""
 
+import math
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional
 
 
+def _latest_sma(close: np.ndarray, window: int) -> Optional[float]:
+    """
+    Latest simple moving average, i.e. the mean of the trailing window.
+
+    Args:
+        close: Close prices as a float array
+        window: SMA length
+
+    Returns:
+        The SMA of the most recent bar, or None if there is not enough data
+        (or any NaN in the window, as with a rolling mean)
+    """
+    if len(close) < window:
+        return None
+    mean = float(close[-window:].mean())
+    return None if math.isnan(mean) else mean
+
+
 class TechnicalIndicators:
     """
     Calculate technical indicators using pandas-ta library.
@@ -22,7 +42,8 @@ class TechnicalIndicators:
         Args:
             df: DataFrame with columns [Open, High, Low, Close, Volume]
         """
-        self.df = df.copy()
+        # Only read from: every df.ta.* call below returns new objects (append=False)
+        self.df = df
 
         # Import pandas_ta and add to DataFrame
         try:
@@ -63,14 +84,12 @@ class TechnicalIndicators:
         """Calculate trend indicators."""
         trend = {}
 
-        # Simple Moving Averages
-        sma_20 = self.df.ta.sma(length=20)
-        sma_50 = self.df.ta.sma(length=50)
-        sma_200 = self.df.ta.sma(length=200) if len(self.df) >= 200 else None
-
-        trend['sma_20'] = round(float(sma_20.iloc[-1]), 2) if not sma_20.empty and pd.notna(sma_20.iloc[-1]) else None
-        trend['sma_50'] = round(float(sma_50.iloc[-1]), 2) if not sma_50.empty and pd.notna(sma_50.iloc[-1]) else None
-        trend['sma_200'] = round(float(sma_200.iloc[-1]), 2) if sma_200 is not None and not sma_200.empty and pd.notna(sma_200.iloc[-1]) else None
+        # Simple Moving Averages (only the latest value is reported, so average
+        # the trailing window instead of computing the whole rolling series)
+        close = self.df['Close'].to_numpy(dtype=np.float64)
+        for length in (20, 50, 200):
+            sma = _latest_sma(close, length)
+            trend[f'sma_{length}'] = round(sma, 2) if sma is not None else None
 
         # Exponential Moving Averages
         ema_12 = self.df.ta.ema(length=12)
@@ -79,13 +98,19 @@ class TechnicalIndicators:
         trend['ema_12'] = round(float(ema_12.iloc[-1]), 2) if not ema_12.empty and pd.notna(ema_12.iloc[-1]) else None
         trend['ema_26'] = round(float(ema_26.iloc[-1]), 2) if not ema_26.empty and pd.notna(ema_26.iloc[-1]) else None
 
-        # MACD
-        macd_result = self.df.ta.macd()
-        if macd_result is not None and not macd_result.empty:
+        # MACD, derived from the EMAs above the same way ta.macd() does it
+        # (signal is the 9-EMA of MACD from its first valid value)
+        macd_line = ema_12 - ema_26 if ema_12 is not None and ema_26 is not None else None
+        first_valid = macd_line.first_valid_index() if macd_line is not None else None
+        signal_line = self.ta.ema(macd_line.loc[first_valid:], length=9) if first_valid is not None else None
+        if signal_line is not None and not signal_line.empty:
+            macd_last = macd_line.iloc[-1]
+            signal_last = signal_line.iloc[-1]
+            hist_last = macd_last - signal_last
             trend['macd'] = {
-                'macd': round(float(macd_result[f'MACD_12_26_9'].iloc[-1]), 4) if pd.notna(macd_result[f'MACD_12_26_9'].iloc[-1]) else None,
-                'signal': round(float(macd_result[f'MACDs_12_26_9'].iloc[-1]), 4) if pd.notna(macd_result[f'MACDs_12_26_9'].iloc[-1]) else None,
-                'histogram': round(float(macd_result[f'MACDh_12_26_9'].iloc[-1]), 4) if pd.notna(macd_result[f'MACDh_12_26_9'].iloc[-1]) else None
+                'macd': round(float(macd_last), 4) if pd.notna(macd_last) else None,
+                'signal': round(float(signal_last), 4) if pd.notna(signal_last) else None,
+                'histogram': round(float(hist_last), 4) if pd.notna(hist_last) else None
             }
         else:
             trend['macd'] = {'macd': None, 'signal': None, 'histogram': None}
@@ -147,9 +172,10 @@ class TechnicalIndicators:
         atr = self.df.ta.atr(length=14)
         volatility['atr'] = round(float(atr.iloc[-1]), 2) if not atr.empty and pd.notna(atr.iloc[-1]) else None
 
-        # Standard Deviation
+        # Standard Deviation (its own call: the Bollinger width can't stand in for it,
+        # since whether bbands uses ddof=0 or 1 depends on pandas-ta's version and TA-Lib)
         stdev = self.df.ta.stdev(length=20)
-        volatility['stdev'] = round(float(stdev.iloc[-1]), 4) if not stdev.empty and pd.notna(stdev.iloc[-1]) else None
+        volatility['stdev'] = round(float(stdev.iloc[-1]), 4) if stdev is not None and not stdev.empty and pd.notna(stdev.iloc[-1]) else None
 
         return volatility
 
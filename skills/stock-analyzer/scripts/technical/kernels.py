@@ -0,0 +1,41 @@
+"""Numba-compiled indicator kernels shared by the stock-analyzer and trading-strategy skills."""
+
+import numpy as np
+
+# Numba is optional; without it the kernels run as plain Python
+from utils._njit import njit
+
+
+@njit(cache=True)
+def rsi_kernel(close, window):
+    """
+    Single-pass Wilder RSI: seed with the first window's mean, then smooth.
+
+    Args:
+        close: Close prices as a float64 array (longer than window)
+        window: RSI length
+
+    Returns:
+        RSI per bar, NaN for the first `window` bars (100 when there are no losses)
+    """
+    n = close.size
+    out = np.full(n, np.nan)
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, window + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain += d
+        else:
+            loss -= d
+    gain /= window
+    loss /= window
+    out[window] = 100.0 - 100.0 / (1.0 + gain / loss) if loss else 100.0
+    for i in range(window + 1, n):
+        d = close[i] - close[i - 1]
+        g = d if d > 0 else 0.0
+        l = -d if d < 0 else 0.0
+        gain = (gain * (window - 1) + g) / window
+        loss = (loss * (window - 1) + l) / window
+        out[i] = 100.0 - 100.0 / (1.0 + gain / loss) if loss else 100.0
+    return out
@@ -1,6 +1,7 @@
 """Trading signal generation from technical indicators."""
 
 from typing import Dict, Any
+import numpy as np
 import pandas as pd
 
 
@@ -209,8 +210,10 @@ class SignalGenerator:
         if 'Volume' not in df.columns or len(df) < 20:
             return 'unknown'
 
-        current_volume = df['Volume'].iloc[-1]
-        avg_volume = df['Volume'].rolling(window=20).mean().iloc[-1]
+        # Only the latest 20-bar average is needed, not the whole rolling series
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        current_volume = volume[-1]
+        avg_volume = volume[-20:].mean()
 
         if pd.isna(current_volume) or pd.isna(avg_volume) or avg_volume == 0:
             return 'unknown'
@@ -0,0 +1,21 @@
+"""Optional Numba JIT decorator with a pure-Python fallback."""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit.
+
+        Supports both the bare (@njit) and called (@njit(cache=True)) forms,
+        so kernels run unchanged as plain Python when Numba is not installed.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+__all__ = ['njit', 'NUMBA_AVAILABLE']
@@ -3,6 +3,24 @@
 from typing import Dict, Any
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_indented(obj: Any, default=None) -> str:
+    """
+    Serialize to 2-space indented JSON, using orjson when available.
+
+    orjson natively handles numpy values (and datetimes, as ISO 8601), so
+    `default` is only called for the types neither encoder understands.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(obj, default=default, option=option).decode()
+    return json.dumps(obj, indent=2, default=default)
+
 
 class JSONFormatter:
     """
@@ -44,7 +62,7 @@ class JSONFormatter:
         if 'history' in data and data['history']:
             output['history'] = data['history'][-10:]
 
-        return json.dumps(output, indent=2)
+        return _dumps_indented(output)
 
     @staticmethod
     def format_error(ticker: str, error_message: str, details: str = None) -> str:
@@ -76,7 +94,7 @@ class JSONFormatter:
         if details:
             error_output['error']['details'] = details
 
-        return json.dumps(error_output, indent=2)
+        return _dumps_indented(error_output)
 
     @staticmethod
     def format_simple(data: Dict[str, Any]) -> str:
@@ -89,4 +107,4 @@ class JSONFormatter:
         Returns:
             Formatted JSON string
         """
-        return json.dumps(data, indent=2, default=str)
+        return _dumps_indented(data, default=str)
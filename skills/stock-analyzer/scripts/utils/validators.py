@@ -3,6 +3,17 @@
 import re
 from typing import Tuple, Optional
 
+# Alphanumeric, dots, and hyphens (compiled once; fullmatch also rejects a trailing newline)
+_TICKER_RE = re.compile(r'[A-Za-z0-9.\-]+')
+
+# Accepted yfinance periods/intervals, listed in the order error messages show them
+_PERIODS = ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+_INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo')
+_VALID_PERIODS = frozenset(_PERIODS)
+_VALID_INTERVALS = frozenset(_INTERVALS)
+_PERIOD_ERROR = f"Invalid period. Must be one of: {', '.join(_PERIODS)}"
+_INTERVAL_ERROR = f"Invalid interval. Must be one of: {', '.join(_INTERVALS)}"
+
 
 class InputValidator:
     """
@@ -27,7 +38,7 @@ class InputValidator:
             return False, "Ticker too long (max 10 characters)"
 
         # Allow alphanumeric, dots, and hyphens
-        if not re.match(r'^[A-Za-z0-9.\-]+$', ticker):
+        if not _TICKER_RE.fullmatch(ticker):
             return False, "Ticker contains invalid characters"
 
         return True, None
@@ -43,10 +54,8 @@ class InputValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        valid_periods = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
-
-        if period not in valid_periods:
-            return False, f"Invalid period. Must be one of: {', '.join(valid_periods)}"
+        if period not in _VALID_PERIODS:
+            return False, _PERIOD_ERROR
 
         return True, None
 
@@ -61,9 +70,7 @@ class InputValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        valid_intervals = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
-
-        if interval not in valid_intervals:
-            return False, f"Invalid interval. Must be one of: {', '.join(valid_intervals)}"
+        if interval not in _VALID_INTERVALS:
+            return False, _INTERVAL_ERROR
 
         return True, None
@@ -0,0 +1,34 @@
+"""Tests for technical.indicators.TechnicalIndicators."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ta = pytest.importorskip("pandas_ta")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from technical.indicators import TechnicalIndicators
+
+
+def _ohlcv(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "Open": close * 0.995,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, n).astype(float),
+    }, index=pd.date_range("2024-01-01", periods=n, freq="B"))
+
+
+def test_volatility_stdev_matches_ta_stdev():
+    df = _ohlcv()
+    expected = ta.stdev(df["Close"], length=20).iloc[-1]
+
+    volatility = TechnicalIndicators(df)._calculate_volatility()
+
+    assert volatility["stdev"] == round(float(expected), 4)
@@ -0,0 +1,39 @@
+"""
+Ahead-of-time compile the backtest kernels with numba.pycc (the RSI kernel
+lives in the stock-analyzer's technical/kernels.py, the simulation in main.py).
+
+With @njit(cache=True) the kernels are compiled on the first run and cached
+under __pycache__; this script moves that cost to install time instead:
+
+    python3 build_aot.py
+
+It writes a _strategy_kernels extension module next to main.py, which
+main.py imports when present (falling back to the @njit kernels otherwise).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    sys.exit("numba is required to build the AOT kernels: pip install numba")
+
+# Hide a previous build so main binds its @njit kernels (which have .py_func)
+sys.modules['_strategy_kernels'] = None
+import main
+import technical.kernels
+
+cc = CC('_strategy_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Signatures match how calculate_rsi and run_backtest call the kernels
+cc.export('rsi_kernel', 'f8[:](f8[:], i8)')(technical.kernels.rsi_kernel.py_func)
+cc.export('simulate', 'Tuple((f8[:], i1[:], i8[:], f8[:], i8[:], f8[:]))(f8[:], i1[:], i8, f8)')(main._simulate.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built _strategy_kernels in {cc.output_dir}")
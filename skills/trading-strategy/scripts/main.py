@@ -3,143 +3,241 @@ import json
 import sys
 import tempfile
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from datetime import datetime
+from pathlib import Path
 
 import pandas as pd
 import numpy as np
 
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+# Reuse the stock-analyzer's file cache (and its history entries), kernels and njit shim
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'stock-analyzer' / 'scripts'))
+# Numba is optional; without it the simulation kernel runs as plain Python
+from utils._njit import njit
+from core.cache import DataCache
+from core.history_cache import (
+    HISTORY_CACHE_DIR, HISTORY_CACHE_TTL, HISTORY_COLUMNS, history_to_json, history_from_json
+)
+from technical.kernels import rsi_kernel as _rsi_kernel
+
+def fetch_history(ticker, period, no_cache=False):
+    """Daily, adjusted price history from the file cache, else Yahoo (refreshing the cache)."""
+    import yfinance as yf
+
+    try:
+        cache = DataCache(cache_dir=HISTORY_CACHE_DIR, ttl_minutes=HISTORY_CACHE_TTL)
+    except OSError:
+        cache = None
+    key = (ticker, period, '1d')
+    if cache is not None and not no_cache:
+        cached = cache.get(*key)
+        if cached is not None:
+            return history_from_json(cached)
+
+    df = yf.Ticker(ticker).history(period=period, interval="1d", auto_adjust=True)
+    if df.empty:
+        return df
+    # Only OHLCV is used; one float64 block makes the later .to_numpy() calls views
+    df = df[list(HISTORY_COLUMNS)].astype(np.float64)
+    if cache is not None:
+        try:
+            cache.set(*key, data=history_to_json(df))
+        except (OSError, TypeError, ValueError):
+            pass  # a failed cache write never fails the backtest
+    return df
+
 def calculate_sma(data, window):
-    return data.rolling(window=window).mean()
+    """Simple moving average (NaN until a full window)."""
+    if bn is None or window > len(data):
+        # (bottleneck rejects a window longer than the data; rolling just returns NaN)
+        return data.rolling(window=window).mean()
+    # bottleneck keeps a running sum, O(N) regardless of window size
+    return pd.Series(bn.move_mean(data.to_numpy(dtype=np.float64), window, min_count=window), index=data.index)
 
 def calculate_rsi(data, window=14):
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    """Calculates RSI on a pandas Series (Wilder's smoothing)."""
+    close = data.to_numpy(dtype=np.float64)
+    if close.size <= window:
+        return pd.Series(np.nan, index=data.index)
+    return pd.Series(_rsi_kernel(close, window), index=data.index)
 
-def run_backtest(df, strategy, initial_capital):
+def crossover_signals(fast, slow):
+    """Per-bar signals (1 buy, -1 sell, 0 hold) for fast crossing slow."""
+    prev_fast, prev_slow = fast[:-1], slow[:-1]
+    curr_fast, curr_slow = fast[1:], slow[1:]
+    signals = np.zeros(len(fast), dtype=np.int8)
+    signals[1:][(prev_fast <= prev_slow) & (curr_fast > curr_slow)] = 1
+    signals[1:][(prev_fast >= prev_slow) & (curr_fast < curr_slow)] = -1
+    return signals
+
+def rsi_reversal_signals(rsi):
+    """Per-bar signals: buy when oversold RSI turns up, sell when overbought RSI turns down."""
+    prev_rsi, curr_rsi = rsi[:-1], rsi[1:]
+    signals = np.zeros(len(rsi), dtype=np.int8)
+    signals[1:][(prev_rsi < 30) & (curr_rsi > prev_rsi)] = 1
+    signals[1:][(prev_rsi > 70) & (curr_rsi < prev_rsi)] = -1
+    return signals
+
+@njit(cache=True)
+def _simulate(prices, signals, start_idx, initial_capital):
+    """
+    All-in/all-out execution of `signals` over `prices` from bar start_idx.
+    Returns the per-bar equity curve plus the trades as parallel arrays
+    (type 1 buy / -1 sell, bar index, price, shares, value), truncated to
+    the number of trades made; trades alternate buy, sell, buy, ...
+    """
+    n = len(prices)
+    equity = np.empty(max(n - start_idx, 0), dtype=np.float64)
+    trade_type = np.empty(n, dtype=np.int8)
+    trade_idx = np.empty(n, dtype=np.int64)
+    trade_price = np.empty(n, dtype=np.float64)
+    trade_shares = np.empty(n, dtype=np.int64)
+    trade_value = np.empty(n, dtype=np.float64)
+    n_trades = 0
     cash = initial_capital
     position = 0
-    trades = []
-    equity_curve = []
-    
-    # Pre-calculate indicators
-    if strategy == 'sma_crossover':
-        df['SMA_Fast'] = calculate_sma(df['Close'], 50)
-        df['SMA_Slow'] = calculate_sma(df['Close'], 200)
-    elif strategy == 'rsi_reversal':
-        df['RSI'] = calculate_rsi(df['Close'], 14)
-
-    # Simulation loop
-    # We iterate from the start but need enough data for indicators
-    start_idx = 200 if strategy == 'sma_crossover' else 15
-    
-    for i in range(start_idx, len(df)):
-        price = df['Close'].iloc[i]
-        date = df.index[i]
-        
-        signal = 0 # 0: Hold, 1: Buy, -1: Sell
-        
-        # Strategy Logic
-        if strategy == 'sma_crossover':
-            # Check for crossover
-            curr_fast = df['SMA_Fast'].iloc[i]
-            curr_slow = df['SMA_Slow'].iloc[i]
-            prev_fast = df['SMA_Fast'].iloc[i-1]
-            prev_slow = df['SMA_Slow'].iloc[i-1]
-            
-            if prev_fast <= prev_slow and curr_fast > curr_slow:
-                signal = 1
-            elif prev_fast >= prev_slow and curr_fast < curr_slow:
-                signal = -1
-                
-        elif strategy == 'rsi_reversal':
-            curr_rsi = df['RSI'].iloc[i]
-            prev_rsi = df['RSI'].iloc[i-1]
-            
-            # Buy: Oversold and turning up
-            if prev_rsi < 30 and curr_rsi > prev_rsi:
-                 signal = 1
-            # Sell: Overbought and turning down
-            elif prev_rsi > 70 and curr_rsi < prev_rsi:
-                 signal = -1
-
-        # Execution
-        if signal == 1 and position == 0:
+    for i in range(start_idx, n):
+        price = prices[i]
+        if signals[i] == 1 and position == 0:
             # Buy
             shares = int(cash / price)
             if shares > 0:
                 cost = shares * price
                 cash -= cost
                 position = shares
-                trades.append({
-                    "type": "buy",
-                    "date": date.strftime('%Y-%m-%d'),
-                    "price": round(price, 2),
-                    "shares": shares,
-                    "value": round(cost, 2)
-                })
-        elif signal == -1 and position > 0:
+                trade_type[n_trades] = 1
+                trade_idx[n_trades] = i
+                trade_price[n_trades] = price
+                trade_shares[n_trades] = shares
+                trade_value[n_trades] = cost
+                n_trades += 1
+        elif signals[i] == -1 and position > 0:
             # Sell
             proceeds = position * price
             cash += proceeds
-            trades.append({
-                "type": "sell",
-                "date": date.strftime('%Y-%m-%d'),
-                "price": round(price, 2),
-                "shares": position,
-                "value": round(proceeds, 2),
-                "profit": round(proceeds - trades[-1]['value'], 2)
-            })
+            trade_type[n_trades] = -1
+            trade_idx[n_trades] = i
+            trade_price[n_trades] = price
+            trade_shares[n_trades] = position
+            trade_value[n_trades] = proceeds
+            n_trades += 1
             position = 0
-            
-        # Update Equity
-        current_equity = cash + (position * price)
-        equity_curve.append(current_equity)
+        equity[i - start_idx] = cash + position * price
+    return (equity, trade_type[:n_trades], trade_idx[:n_trades], trade_price[:n_trades],
+            trade_shares[:n_trades], trade_value[:n_trades])
+
+# Prefer the kernels precompiled by build_aot.py (no JIT compile on a cold start)
+try:
+    from _strategy_kernels import rsi_kernel as _rsi_kernel
+    from _strategy_kernels import simulate as _simulate
+except ImportError:
+    pass
+
+def _sma_crossover(close):
+    indicators = {
+        'SMA_Fast': calculate_sma(close, 50).to_numpy(),
+        'SMA_Slow': calculate_sma(close, 200).to_numpy()
+    }
+    return indicators, crossover_signals(indicators['SMA_Fast'], indicators['SMA_Slow'])
+
+def _rsi_reversal(close):
+    indicators = {'RSI': calculate_rsi(close, 14).to_numpy()}
+    return indicators, rsi_reversal_signals(indicators['RSI'])
+
+# Strategy name -> (indicators + signals builder, first bar whose indicators have settled)
+STRATEGIES = {
+    'sma_crossover': (_sma_crossover, 200),
+    'rsi_reversal': (_rsi_reversal, 15)
+}
+
+def _bar_dates(index):
+    """Local calendar date of each bar as datetime64[D] (a tz-aware index is read as wall-clock time)."""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[D]')
+
+def run_backtest(df, strategy, initial_capital):
+    # Pre-calculate indicators and the whole signal array (NaN comparisons are False -> hold)
+    # (kept as arrays beside df, not added as columns, so df is never mutated)
+    build_signals, start_idx = STRATEGIES[strategy]
+    indicators, signals = build_signals(df['Close'])
+
+    prices = df['Close'].to_numpy(dtype=np.float64)
+    equity, trade_type, trade_idx, trade_price, trade_shares, trade_value = _simulate(
+        prices, signals, start_idx, float(initial_capital))
+
+    # Trades stay as parallel arrays (rounded in one pass); trade_records() builds the JSON dicts.
+    # A sell's profit is measured against the (rounded) value of the buy before it; NaN for buys.
+    value = np.round(trade_value, 2)
+    profit = np.full(len(value), np.nan)
+    n_sells = len(value) // 2
+    profit[1::2] = np.round(trade_value[1::2] - value[0:2 * n_sells:2], 2)
+    trades = {
+        'type': trade_type,
+        'index': trade_idx,
+        'price': np.round(trade_price, 2),
+        'shares': trade_shares,
+        'value': value,
+        'profit': profit
+    }
 
     # Final Value
-    final_equity = equity_curve[-1] if equity_curve else initial_capital
+    final_equity = float(equity[-1]) if equity.size else initial_capital
     
     return {
         "final_equity": final_equity,
         "trades": trades,
-        "equity_curve": equity_curve,
-        "data": df  # Return df for charting
+        "equity_curve": equity,  # ndarray, one value per simulated bar
+        "indicators": indicators  # column name -> array aligned with df, for charting
     }
 
-def generate_chart(ticker, df, trades, strategy):
+def trade_records(df, trades):
+    """JSON-ready trade dicts from run_backtest's trade arrays (dates formatted in one batch)."""
+    dates = np.datetime_as_string(_bar_dates(df.index)[trades['index']], unit='D').tolist()
+    records = []
+    for kind, date, price, shares, value, profit in zip(
+            trades['type'].tolist(), dates, trades['price'].tolist(), trades['shares'].tolist(),
+            trades['value'].tolist(), trades['profit'].tolist()):
+        record = {
+            "type": "buy" if kind == 1 else "sell",
+            "date": date,
+            "price": price,
+            "shares": shares,
+            "value": value
+        }
+        if kind == -1:
+            record["profit"] = profit
+        records.append(record)
+    return records
+
+@lru_cache(maxsize=1)
+def _chart_style():
+    """Build the mplfinance style once per process instead of once per chart."""
+    import mplfinance as mpf
+    return mpf.make_mpf_style(base_mpf_style='yahoo')
+
+def generate_chart(ticker, df, trades, strategy, indicators):
     try:
+        import matplotlib
+        matplotlib.use('Agg')  # file output only; skips GUI backend probing
         import mplfinance as mpf
+
+        # mplfinance wants Series, so the indicator arrays only become columns here (on a new frame)
+        df = df.assign(**indicators)
         
-        # Filter data to matching length of simulation (if needed) or just last portion
-        # But we want to show the trades
-        
-        # Prepare markers
-        buy_indices = []
-        sell_indices = []
-        
-        # Map trade dates to dataframe indices
-        # This is a bit tricky if dates are not exact, but we used df index dates
-        
-        # Create a marker column
-        df['Buy_Marker'] = np.nan
-        df['Sell_Marker'] = np.nan
-        
-        for trade in trades:
-            date_str = trade['date']
-            price = trade['price']
-            # Find closest index? Exact match should work if data hasn't changed
-            try:
-                date_dt = pd.Timestamp(date_str)
-                # If date exists in index
-                if date_dt in df.index:
-                    if trade['type'] == 'buy':
-                        df.at[date_dt, 'Buy_Marker'] = price * 0.98 # Place below
-                    elif trade['type'] == 'sell':
-                        df.at[date_dt, 'Sell_Marker'] = price * 1.02 # Place above
-            except:
-                pass
+        # Marker columns: NaN except on trade bars, placed below buys / above sells.
+        # The trade arrays carry each trade's bar index, so this is one scatter per side.
+        for column, kind, offset in (('Buy_Marker', 1, 0.98), ('Sell_Marker', -1, 1.02)):
+            side = trades['type'] == kind
+            markers = np.full(len(df), np.nan)
+            markers[trades['index'][side]] = trades['price'][side] * offset
+            df[column] = markers
 
         # Plots
         add_plots = []
@@ -172,7 +270,7 @@ def generate_chart(ticker, df, trades, strategy):
         mpf.plot(
             df,
             type='candle',
-            style='yahoo',
+            style=_chart_style(),
             volume=True,
             addplot=add_plots,
             savefig=filepath,
@@ -185,65 +283,95 @@ def generate_chart(ticker, df, trades, strategy):
     except Exception as e:
         return None
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--ticker", required=True)
-    parser.add_argument("--strategy", required=True, choices=['sma_crossover', 'rsi_reversal'])
-    parser.add_argument("--period", default="2y")
-    parser.add_argument("--initial-capital", type=float, default=10000.0)
-    
-    args = parser.parse_args()
-    
-    try:
-        import yfinance as yf
-    except ImportError as e:
-        print(json.dumps({"error": f"Missing dependency: {str(e)}"}))
-        return
-
+def backtest_ticker(ticker, strategy, period, initial_capital, no_cache=False, chart=True):
+    """Fetch, backtest and chart one ticker; returns its JSON output dict."""
     # Fetch Data
     # Ensure enough history for 200 SMA
-    fetch_period = args.period
-    if args.strategy == 'sma_crossover' and args.period in ['1mo', '3mo', '6mo', '1y']:
+    fetch_period = period
+    if strategy == 'sma_crossover' and period in ['1mo', '3mo', '6mo', '1y']:
          fetch_period = "2y" # Force at least 2y for SMA 200 to settle
          
-    stock = yf.Ticker(args.ticker)
-    df = stock.history(period=fetch_period, interval="1d", auto_adjust=True)
+    df = fetch_history(ticker, fetch_period, no_cache)
     
     if df.empty:
-        print(json.dumps({"error": f"No data for {args.ticker}"}))
-        return
+        return {"error": f"No data for {ticker}"}
 
     # Run Backtest
-    result = run_backtest(df.copy(), args.strategy, args.initial_capital)
+    result = run_backtest(df, strategy, initial_capital)
     
     # Calculate Metrics
-    total_return = result['final_equity'] - args.initial_capital
-    total_return_pct = (total_return / args.initial_capital) * 100
+    total_return = result['final_equity'] - initial_capital
+    total_return_pct = (total_return / initial_capital) * 100
     
-    wins = [t for t in result['trades'] if t.get('profit', 0) > 0]
-    sell_trades = [t for t in result['trades'] if t['type'] == 'sell']
-    win_rate = (len(wins) / len(sell_trades)) * 100 if sell_trades else 0
+    trades = result['trades']
+    sell_profits = trades['profit'][trades['type'] == -1]
+    win_rate = (np.count_nonzero(sell_profits > 0) / sell_profits.size) * 100 if sell_profits.size else 0
     
     # Generate Chart
-    chart_path = generate_chart(args.ticker, result['data'], result['trades'], args.strategy)
+    chart_path = generate_chart(ticker, df, trades, strategy, result['indicators']) if chart else None
     
-    output = {
+    return {
         "metadata": {
-            "ticker": args.ticker,
-            "strategy": args.strategy,
-            "period": args.period,
-            "initial_capital": args.initial_capital
+            "ticker": ticker,
+            "strategy": strategy,
+            "period": period,
+            "initial_capital": initial_capital
         },
         "metrics": {
             "final_equity": round(result['final_equity'], 2),
             "total_return": round(total_return, 2),
             "total_return_pct": round(total_return_pct, 2),
-            "total_trades": len(result['trades']),
+            "total_trades": len(trades['type']),
             "win_rate": round(win_rate, 2)
         },
-        "trades": result['trades'],
+        "trades": trade_records(df, trades),
         "chart": chart_path
     }
+
+def backtest_tickers(tickers, strategy, period, initial_capital, no_cache=False, chart=True):
+    """Backtest several tickers in parallel processes; results follow the order of `tickers`."""
+    results = {}
+    workers = min(len(tickers), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(backtest_ticker, ticker, strategy, period, initial_capital, no_cache, chart): ticker
+            for ticker in tickers
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                results[ticker] = {"error": f"Backtest failed for {ticker}: {str(e)}"}
+    return [results[ticker] for ticker in tickers]
+
+def main():
+    parser = argparse.ArgumentParser()
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ticker")
+    target.add_argument("--tickers", nargs="+", help="Backtest several tickers in parallel (outputs a JSON list)")
+    parser.add_argument("--strategy", required=True, choices=list(STRATEGIES))
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--initial-capital", type=float, default=10000.0)
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the price history cache")
+    parser.add_argument("--no-chart", action="store_true", help="Skip chart generation")
+    
+    args = parser.parse_args()
+    
+    try:
+        import yfinance as yf
+    except ImportError as e:
+        print(json.dumps({"error": f"Missing dependency: {str(e)}"}))
+        return
+
+    if args.tickers:
+        tickers = list(dict.fromkeys(args.tickers))  # de-duplicate, keep order
+        output = backtest_tickers(tickers, args.strategy, args.period, args.initial_capital, args.no_cache, not args.no_chart)
+    else:
+        output = backtest_ticker(args.ticker, args.strategy, args.period, args.initial_capital, args.no_cache, not args.no_chart)
+        if 'error' in output:
+            print(json.dumps(output))
+            return
     
     print(json.dumps(output, indent=2))
 